@@ -6,10 +6,13 @@ This API provides transparent, educational arc flash calculations
 showing all intermediate steps per IEEE 1584-2018 standard.
 """
 
-from fastapi import FastAPI, HTTPException
+import hashlib
+import orjson
+from fastapi import Body, FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from typing import Dict, Any
+from typing import Annotated, Dict, Any
 from app.models.equipment import EquipmentInput, CalculationResult
 from app.services.arc_flash import ArcFlashCalculator
 
@@ -41,7 +44,9 @@ app = FastAPI(
     license_info={
         "name": "MIT License",
         "url": "https://opensource.org/licenses/MIT",
-    }
+    },
+    # orjson serializes the float-heavy payloads much faster than stdlib json
+    default_response_class=ORJSONResponse,
 )
 
 # CORS for frontend
@@ -71,19 +76,22 @@ async def root():
         "endpoints": {
             "calculate": "/api/v1/calculate",
             "calculate_detailed": "/api/v1/calculate/detailed",
+            "calculate_batch": "/api/v1/calculate/batch",
             "docs": "/docs",
             "health": "/api/v1/health"
         }
     }
 
 
+# Calculation endpoints are plain `def` so FastAPI runs them in its
+# threadpool and CPU-bound work doesn't block the event loop
 @app.post(
     "/api/v1/calculate", 
     response_model=CalculationResult,
     summary="Calculate Arc Flash Hazard",
     response_description="Arc flash calculation results with PPE requirements"
 )
-async def calculate_arc_flash(equipment: EquipmentInput):
+def calculate_arc_flash(equipment: EquipmentInput):
     """
     Calculate arc flash incident energy per IEEE 1584-2018.
     
@@ -132,11 +140,101 @@ async def calculate_arc_flash(equipment: EquipmentInput):
         )
 
 
+# Upper bound on items per batch request, so one request can't fan out
+# unbounded validation and calculation work
+MAX_BATCH_SIZE = 1000
+
+
+@app.post(
+    "/api/v1/calculate/batch",
+    response_model=list[CalculationResult],
+    summary="Calculate Arc Flash Hazard for Many Equipment",
+    response_description="Arc flash calculation results, in request order"
+)
+def calculate_arc_flash_batch(
+    equipments: Annotated[list[EquipmentInput], Body(max_length=MAX_BATCH_SIZE)]
+):
+    """
+    Calculate arc flash incident energy for a list of equipment in one request.
+    
+    Performs the same calculation as `/calculate` for every item, evaluated
+    together as arrays. Use this for parameter sweeps (e.g. a range of
+    clearing times or working distances) and facility-wide studies instead
+    of sending one request per equipment.
+    
+    ## Returns
+    
+    One calculation result per input equipment, in the same order.
+    At most `MAX_BATCH_SIZE` (1000) items per request.
+    """
+    try:
+        return calculator.calculate_batch(equipments)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Calculation error: {str(e)}"
+        )
+
+
 class DetailedCalculation(BaseModel):
     """Extended calculation result with step-by-step breakdown"""
     result: CalculationResult
     calculation_steps: Dict[str, Any]
-    ieee_references: Dict[str, str]
+    ieee_references: Dict[str, Any]
+
+
+# Enclosure types reported as "Enclosed" in the step breakdown
+_ENCLOSED = frozenset({"VCB", "VCBB", "HCB"})
+
+# Static parts of the detailed breakdown, built once at import.
+# Shared between requests - treat as read-only.
+_STEP1_TMPL = {
+    "description": "Validate inputs are within IEEE 1584-2018 scope",
+    "voltage_range": "208V - 15,000V",
+}
+
+_STEP2_TMPL = {
+    "description": "Calculate arcing current using IEEE 1584-2018 Equation 4",
+    "equation": "lg(Ia) = K + 0.662*lg(Ibf) + 0.0966*V + 0.000526*G + 0.5588*V*lg(Ibf) - 0.00304*G*lg(Ibf)",
+    "ieee_reference": "IEEE 1584-2018, Section 4.3, Equation 4"
+}
+
+_STEP3_TMPL = {
+    "description": "Calculate incident energy at working distance",
+    "equation": "E = (4.184 * Cf * Ia^n * t) / (4π * D²)",
+    "ieee_reference": "IEEE 1584-2018, Section 4.4, Equation 6"
+}
+
+_STEP4_TMPL = {
+    "description": "Determine PPE category per NFPA 70E Table 130.5(G)",
+    "thresholds": {
+        "Category_0": "< 1.2 cal/cm²",
+        "Category_1": "1.2 - 4 cal/cm²",
+        "Category_2": "4 - 8 cal/cm²",
+        "Category_3": "8 - 25 cal/cm²",
+        "Category_4": "> 25 cal/cm²"
+    },
+    "nfpa_reference": "NFPA 70E-2021, Table 130.5(G)"
+}
+
+_STEP5_TMPL = {
+    "description": "Calculate distance to 1.2 cal/cm² (AFB)",
+    "equation": "AFB = sqrt((4.184 * Cf * Ia^n * t) / (4π * E_threshold))",
+    "threshold": "1.2 cal/cm² (second-degree burn onset)",
+    "ieee_reference": "IEEE 1584-2018, Section 4.5"
+}
+
+# IEEE standard references
+_IEEE_REFERENCES = {
+    "primary_standard": "IEEE Std 1584-2018: IEEE Guide for Performing Arc-Flash Hazard Calculations",
+    "ppe_standard": "NFPA 70E-2021: Standard for Electrical Safety in the Workplace",
+    "sections_used": [
+        "Section 4.3: Arcing Current Calculation",
+        "Section 4.4: Incident Energy Calculation",
+        "Section 4.5: Arc Flash Boundary"
+    ],
+    "download_link": "https://standards.ieee.org/standard/1584-2018.html"
+}
 
 
 @app.post(
@@ -145,7 +243,7 @@ class DetailedCalculation(BaseModel):
     summary="Calculate with Step-by-Step Breakdown",
     response_description="Detailed calculation showing all intermediate steps"
 )
-async def calculate_arc_flash_detailed(equipment: EquipmentInput):
+def calculate_arc_flash_detailed(equipment: EquipmentInput):
     """
     Calculate arc flash with educational step-by-step breakdown.
     
@@ -172,91 +270,69 @@ async def calculate_arc_flash_detailed(equipment: EquipmentInput):
     show your work and provide transparency in calculations.
     """
     try:
-        # Get standard result
-        result = calculator.calculate(equipment)
+        # Calculate with all intermediate steps kept for transparency
+        result, trace = calculator.calculate(equipment, return_trace=True)
         
-        # Calculate intermediate steps for transparency
-        voltage_kv = equipment.voltage / 1000.0
-        lg_ibf = calculator._log10(equipment.bolted_fault_current)
-        
-        # Determine K constant
-        if equipment.enclosure_type.value in ["VCB", "VCBB", "HCB"]:
-            K = -0.153
+        if equipment.enclosure_type.value in _ENCLOSED:
             enclosure_class = "Enclosed"
         else:
-            K = -0.097
             enclosure_class = "Open Air"
         
-        # Build detailed step breakdown
+        # Build detailed step breakdown from the static templates
         calculation_steps = {
             "step_1_input_validation": {
-                "description": "Validate inputs are within IEEE 1584-2018 scope",
-                "voltage_range": "208V - 15,000V",
+                **_STEP1_TMPL,
                 "input_voltage": f"{equipment.voltage}V",
                 "status": "✓ Valid" if 208 <= equipment.voltage <= 15000 else "✗ Out of range"
             },
             "step_2_arcing_current": {
-                "description": "Calculate arcing current using IEEE 1584-2018 Equation 4",
-                "equation": "lg(Ia) = K + 0.662*lg(Ibf) + 0.0966*V + 0.000526*G + 0.5588*V*lg(Ibf) - 0.00304*G*lg(Ibf)",
+                **_STEP2_TMPL,
                 "inputs": {
-                    "K": K,
+                    "K": trace["K"],
                     "K_description": f"Constant for {enclosure_class} equipment",
                     "Ibf": equipment.bolted_fault_current,
-                    "V_kV": voltage_kv,
+                    "V_kV": trace["voltage_kv"],
                     "G_mm": equipment.electrode_gap
                 },
                 "intermediate": {
-                    "lg_Ibf": round(lg_ibf, 4),
-                    "term_1": round(K, 4),
-                    "term_2": round(0.662 * lg_ibf, 4),
-                    "term_3": round(0.0966 * voltage_kv, 4),
-                    "term_4": round(0.000526 * equipment.electrode_gap, 4),
-                    "term_5": round(0.5588 * voltage_kv * lg_ibf, 4),
-                    "term_6": round(-0.00304 * equipment.electrode_gap * lg_ibf, 4)
+                    "lg_Ibf": round(trace["lg_ibf"], 4),
+                    "term_1": round(trace["term_1"], 4),
+                    "term_2": round(trace["term_2"], 4),
+                    "term_3": round(trace["term_3"], 4),
+                    "term_4": round(trace["term_4"], 4),
+                    "term_5": round(trace["term_5"], 4),
+                    "term_6": round(trace["term_6"], 4)
                 },
                 "result": {
-                    "lg_Ia": round(calculator._log10(result.arcing_current), 4),
+                    "lg_Ia": round(trace["lg_ia"], 4),
                     "Ia": result.arcing_current,
                     "units": "Amperes"
-                },
-                "ieee_reference": "IEEE 1584-2018, Section 4.3, Equation 4"
+                }
             },
             "step_3_incident_energy": {
-                "description": "Calculate incident energy at working distance",
-                "equation": "E = (4.184 * Cf * Ia^n * t) / (4π * D²)",
+                **_STEP3_TMPL,
                 "inputs": {
-                    "Cf": calculator.ENCLOSURE_FACTORS[equipment.enclosure_type],
+                    "Cf": trace["cf"],
                     "Ia": result.arcing_current,
                     "t": equipment.fault_clearing_time,
                     "D": equipment.working_distance,
-                    "n": 1.0
+                    "n": trace["n"]
                 },
                 "result": {
                     "E": result.incident_energy,
                     "units": "cal/cm²"
-                },
-                "ieee_reference": "IEEE 1584-2018, Section 4.4, Equation 6"
+                }
             },
             "step_4_ppe_category": {
-                "description": "Determine PPE category per NFPA 70E Table 130.5(G)",
-                "thresholds": {
-                    "Category_0": "< 1.2 cal/cm²",
-                    "Category_1": "1.2 - 4 cal/cm²",
-                    "Category_2": "4 - 8 cal/cm²",
-                    "Category_3": "8 - 25 cal/cm²",
-                    "Category_4": "> 25 cal/cm²"
-                },
+                **_STEP4_TMPL,
                 "incident_energy": result.incident_energy,
                 "result": {
                     "category": result.ppe_category,
                     "description": calculator._get_ppe_description(result.ppe_category)
-                },
-                "nfpa_reference": "NFPA 70E-2021, Table 130.5(G)"
+                }
             },
             "step_5_arc_flash_boundary": {
-                "description": "Calculate distance to 1.2 cal/cm² (AFB)",
-                "equation": "AFB = sqrt((4.184 * Cf * Ia^n * t) / (4π * E_threshold))",
-                "threshold": "1.2 cal/cm² (second-degree burn onset)",
+                **_STEP5_TMPL,
                 "result": {
                     "AFB": result.arc_flash_boundary,
                     "units": "inches",
@@ -264,27 +340,14 @@ async def calculate_arc_flash_detailed(equipment: EquipmentInput):
                         "Within safe zone" if result.arc_flash_boundary < equipment.working_distance
                         else "Exceeds working distance - hazard present"
                     )
-                },
-                "ieee_reference": "IEEE 1584-2018, Section 4.5"
+                }
             }
         }
         
-        # IEEE standard references
-        ieee_references = {
-            "primary_standard": "IEEE Std 1584-2018: IEEE Guide for Performing Arc-Flash Hazard Calculations",
-            "ppe_standard": "NFPA 70E-2021: Standard for Electrical Safety in the Workplace",
-            "sections_used": [
-                "Section 4.3: Arcing Current Calculation",
-                "Section 4.4: Incident Energy Calculation",
-                "Section 4.5: Arc Flash Boundary"
-            ],
-            "download_link": "https://standards.ieee.org/standard/1584-2018.html"
-        }
-        
         return DetailedCalculation(
             result=result,
             calculation_steps=calculation_steps,
-            ieee_references=ieee_references
+            ieee_references=_IEEE_REFERENCES
         )
         
     except Exception as e:
@@ -294,65 +357,100 @@ async def calculate_arc_flash_detailed(equipment: EquipmentInput):
         )
 
 
+# Static GET payloads, serialized once at import
+_HEALTH_BYTES = orjson.dumps({
+    "status": "healthy",
+    "calculator": "ready",
+    "standard": "IEEE 1584-2018",
+    "version": "0.1.0",
+    "components": {
+        "arc_flash_calculator": "operational",
+        "input_validation": "operational",
+        "ppe_determination": "operational"
+    }
+})
+
+_STANDARDS_INFO_BYTES = orjson.dumps({
+    "ieee_1584_2018": {
+        "title": "IEEE Guide for Performing Arc-Flash Hazard Calculations",
+        "year": 2018,
+        "scope": "Provides methods for calculating arc flash hazards in systems from 208V to 15kV",
+        "key_equations": {
+            "arcing_current": "Equation 4",
+            "incident_energy": "Equation 6",
+            "arc_flash_boundary": "Derived from incident energy equation"
+        },
+        "limitations": [
+            "Valid for three-phase AC systems only",
+            "Voltage range: 208V - 15,000V",
+            "Requires bolted fault current < 106 kA"
+        ]
+    },
+    "nfpa_70e": {
+        "title": "Standard for Electrical Safety in the Workplace",
+        "year": 2021,
+        "scope": "Provides requirements for electrical safety-related work practices",
+        "ppe_categories": "Table 130.5(G) - PPE Categories based on incident energy",
+        "categories": {
+            "0": "< 1.2 cal/cm²",
+            "1": "1.2 - 4 cal/cm²",
+            "2": "4 - 8 cal/cm²",
+            "3": "8 - 25 cal/cm²",
+            "4": "> 25 cal/cm²"
+        }
+    },
+    "validation": {
+        "method": "Calculations validated against IEEE 1584-2018 example problems",
+        "test_coverage": "12 automated tests covering edge cases",
+        "source_code": "https://github.com/shanks847/arc-flash-studio"
+    }
+})
+
+
+def _etag(content: bytes) -> str:
+    """Strong ETag for a static payload"""
+    return f'"{hashlib.sha256(content).hexdigest()[:16]}"'
+
+
+_HEALTH_ETAG = _etag(_HEALTH_BYTES)
+_STANDARDS_INFO_ETAG = _etag(_STANDARDS_INFO_BYTES)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Check an If-None-Match header against our ETag.
+    
+    Handles "*", comma-separated lists and W/ weak tags (proxies often
+    weaken tags) using the weak comparison RFC 9110 requires here.
+    """
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+def _static_json(request: Request, content: bytes, etag: str) -> Response:
+    """Serve pre-serialized JSON, or 304 if the client already has it"""
+    headers = {"ETag": etag}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
 @app.get("/api/v1/health")
-async def health_check():
+async def health_check(request: Request):
     """
     Detailed health check endpoint
     
     Returns API status and component health.
     """
-    return {
-        "status": "healthy",
-        "calculator": "ready",
-        "standard": "IEEE 1584-2018",
-        "version": "0.1.0",
-        "components": {
-            "arc_flash_calculator": "operational",
-            "input_validation": "operational",
-            "ppe_determination": "operational"
-        }
-    }
+    return _static_json(request, _HEALTH_BYTES, _HEALTH_ETAG)
 
 
 @app.get("/api/v1/standards-info")
-async def standards_info():
+async def standards_info(request: Request):
     """
     Information about implemented standards and their scope
     
     Returns details about IEEE 1584-2018 and NFPA 70E compliance.
     """
-    return {
-        "ieee_1584_2018": {
-            "title": "IEEE Guide for Performing Arc-Flash Hazard Calculations",
-            "year": 2018,
-            "scope": "Provides methods for calculating arc flash hazards in systems from 208V to 15kV",
-            "key_equations": {
-                "arcing_current": "Equation 4",
-                "incident_energy": "Equation 6",
-                "arc_flash_boundary": "Derived from incident energy equation"
-            },
-            "limitations": [
-                "Valid for three-phase AC systems only",
-                "Voltage range: 208V - 15,000V",
-                "Requires bolted fault current < 106 kA"
-            ]
-        },
-        "nfpa_70e": {
-            "title": "Standard for Electrical Safety in the Workplace",
-            "year": 2021,
-            "scope": "Provides requirements for electrical safety-related work practices",
-            "ppe_categories": "Table 130.5(G) - PPE Categories based on incident energy",
-            "categories": {
-                "0": "< 1.2 cal/cm²",
-                "1": "1.2 - 4 cal/cm²",
-                "2": "4 - 8 cal/cm²",
-                "3": "8 - 25 cal/cm²",
-                "4": "> 25 cal/cm²"
-            }
-        },
-        "validation": {
-            "method": "Calculations validated against IEEE 1584-2018 example problems",
-            "test_coverage": "12 automated tests covering edge cases",
-            "source_code": "https://github.com/shanks847/arc-flash-studio"
-        }
-    }
\ No newline at end of file
+    return _static_json(request, _STANDARDS_INFO_BYTES, _STANDARDS_INFO_ETAG)
@@ -6,7 +6,7 @@ Uses Pydantic for validation and serialization.
 
 from enum import Enum
 from typing import Optional
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field
 
 
 class EnclosureType(str, Enum):
@@ -37,8 +37,8 @@ class EquipmentInput(BaseModel):
     
     voltage: float = Field(
         ...,
-        description="System voltage in Volts",
-        gt=0,
+        description="System voltage in Volts (IEEE 1584-2018 range: 208V - 15kV)",
+        ge=208,
         le=15000
     )
     
@@ -80,22 +80,6 @@ class EquipmentInput(BaseModel):
         description="System grounding type"
     )
     
-    @field_validator('voltage')
-    @classmethod
-    def validate_voltage_range(cls, v: float) -> float:
-        """Ensure voltage is in IEEE 1584-2018 valid range"""
-        if v < 208:
-            raise ValueError("Voltage must be at least 208V for IEEE 1584-2018")
-        return v
-    
-    @field_validator('electrode_gap')
-    @classmethod
-    def validate_gap_for_voltage(cls, v: float, info) -> float:
-        """Validate gap is appropriate for voltage level"""
-        # This will be called after voltage validation
-        # Additional cross-field validation can be added here
-        return v
-    
     model_config = {
         "json_schema_extra": {
             "examples": [
@@ -0,0 +1,78 @@
+"""
+Compiled numeric kernels for the IEEE 1584-2018 arc flash calculator.
+Kept free of Pydantic models so Numba can compile them.
+
+Do not build this module with mypyc or Cython: they turn the functions
+into builtins, which @njit rejects ("The decorated object is not a
+function"). Numba is the compilation step here.
+"""
+
+import math
+from typing import Final
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional - run the kernels as plain Python
+    def njit(*args, **kwargs):  # type: ignore[no-redef]
+        """No-op stand-in for numba.njit"""
+        def decorator(func):
+            return func
+        return decorator
+
+# Incident energy / boundary constants, folded so the hot path multiplies
+# instead of dividing
+_INV_4PI: Final = 1.0 / (4.0 * math.pi)
+_BOUNDARY_K: Final = 4.184 * _INV_4PI / 1.2  # 4.184 / (4π * 1.2 cal/cm²)
+
+
+@njit(cache=True, fastmath=True)
+def _ieee1584_core(
+    vkv: float,
+    ibf: float,
+    gap: float,
+    t: float,
+    d: float,
+    k_coeffs: np.ndarray
+) -> tuple[float, float, float]:
+    """
+    IEEE 1584-2018 kernel for a single equipment.
+
+    Same equations as ArcFlashCalculator.calculate_arcing_current,
+    calculate_incident_energy and calculate_arc_flash_boundary.
+
+    Args:
+        vkv: System voltage (kV)
+        ibf: Bolted fault current (A)
+        gap: Conductor gap (mm)
+        t: Arc duration (s)
+        d: Working distance (inches)
+        k_coeffs: Enclosure constants (K, Cf, n) as float64
+
+    Returns:
+        (arcing current, incident energy, arc flash boundary)
+    """
+    # float() so the plain-Python fallback returns floats, not np.float64
+    K: float = float(k_coeffs[0])
+    cf: float = float(k_coeffs[1])
+    n: float = float(k_coeffs[2])
+
+    lg: float = math.log10(ibf)
+    lg_ia: float = (
+        K
+        + 0.662 * lg
+        + 0.0966 * vkv
+        + 0.000526 * gap
+        + 0.5588 * vkv * lg
+        - 0.00304 * gap * lg
+    )
+    ia: float = 10.0 ** lg_ia
+    ia_n: float = ia if n == 1.0 else ia ** n
+    cf_ia_t: float = cf * ia_n * t
+    energy: float = 4.184 * cf_ia_t * _INV_4PI / (d * d)
+    boundary: float = math.sqrt(_BOUNDARY_K * cf_ia_t)
+    return ia, energy, boundary
+
+
+# Compile (or load from cache) at import so the first request doesn't pay for it
+_ieee1584_core(0.48, 40000.0, 32.0, 0.05, 24.0, np.array([-0.153, 1.0, 1.0]))
@@ -4,9 +4,15 @@ Implements the latest standard for arc flash hazard calculations.
 """
 
 import math
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Any, Final, Literal, Union, overload
+import numpy as np
 from app.models.equipment import EquipmentInput, CalculationResult, EnclosureType
+from app.services._arc_flash_kernels import _BOUNDARY_K, _INV_4PI, _ieee1584_core
 
-# Add these helper methods to the ArcFlashCalculator class
+# NFPA 70E PPE category upper bounds (cal/cm²), exclusive
+_PPE_THRESHOLDS: Final = (1.2, 4.0, 8.0, 25.0)
 
 
 class ArcFlashCalculator:
@@ -17,13 +23,25 @@ class ArcFlashCalculator:
     Arc-Flash Hazard Calculations
     """
     
-    # IEEE 1584-2018 Constants
-    ENCLOSURE_FACTORS = {
-        EnclosureType.VCB: 1.0,
-        EnclosureType.VCBB: 0.973,
-        EnclosureType.HCB: 1.056,
-        EnclosureType.VOA: 1.0,
-        EnclosureType.HOA: 1.0,
+    # IEEE 1584-2018 Constants per enclosure: (K, Cf, n)
+    # - K = arcing current constant (simplified - full standard has more detail)
+    # - Cf = enclosure correction factor
+    # - n = incident energy exponent (simplified to 1.0 for all configurations)
+    PARAMS = {
+        EnclosureType.VCB: (-0.153, 1.0, 1.0),    # Enclosed
+        EnclosureType.VCBB: (-0.153, 0.973, 1.0), # Enclosed
+        EnclosureType.HCB: (-0.153, 1.056, 1.0),  # Enclosed
+        EnclosureType.VOA: (-0.097, 1.0, 1.0),    # Open air
+        EnclosureType.HOA: (-0.097, 1.0, 1.0),    # Open air
+    }
+    
+    # Positional enclosure codes for the array API (calculate_batch_arrays)
+    ENCLOSURE_CODES = {
+        EnclosureType.VCB: 0,
+        EnclosureType.VCBB: 1,
+        EnclosureType.HCB: 2,
+        EnclosureType.VOA: 3,
+        EnclosureType.HOA: 4,
     }
 
     def _log10(self, value: float) -> float:
@@ -41,39 +59,157 @@ class ArcFlashCalculator:
         }
         return descriptions.get(category, "Unknown category")
     
-    def calculate(self, equipment: EquipmentInput) -> CalculationResult:
+    @overload
+    def calculate(
+        self,
+        equipment: EquipmentInput,
+        *,
+        return_trace: Literal[False] = ...
+    ) -> CalculationResult: ...
+    
+    @overload
+    def calculate(
+        self,
+        equipment: EquipmentInput,
+        *,
+        return_trace: Literal[True]
+    ) -> tuple[CalculationResult, dict[str, Any]]: ...
+    
+    def calculate(
+        self,
+        equipment: EquipmentInput,
+        *,
+        return_trace: bool = False
+    ) -> Union[CalculationResult, tuple[CalculationResult, dict[str, Any]]]:
         """
         Perform complete arc flash calculation.
         
         Args:
             equipment: Equipment parameters
+            return_trace: Also return every intermediate value, for
+                step-by-step breakdowns
             
         Returns:
             CalculationResult with incident energy, PPE category, etc.
+            With return_trace, a (CalculationResult, trace) tuple - see
+            _calculate_full for the trace keys.
         """
-        warnings = []
+        if return_trace:
+            return self._calculate_full(equipment)
+        
+        # Steps 1-4, cached on the scalar inputs
+        (
+            arcing_current,
+            incident_energy,
+            ppe_category,
+            boundary,
+            correction_factor,
+        ) = _calculate_cached(
+            equipment.voltage,
+            equipment.bolted_fault_current,
+            equipment.working_distance,
+            equipment.enclosure_type,
+            equipment.electrode_gap,
+            equipment.fault_clearing_time
+        )
         
-        # Step 1: Calculate arcing current
-        arcing_current = self.calculate_arcing_current(equipment)
+        return self._build_result(
+            equipment,
+            arcing_current,
+            incident_energy,
+            ppe_category,
+            boundary,
+            correction_factor
+        )
+    
+    def _calculate_full(
+        self,
+        equipment: EquipmentInput
+    ) -> tuple[CalculationResult, dict[str, Any]]:
+        """
+        Perform complete arc flash calculation, keeping every intermediate value.
+        
+        Backs calculate(return_trace=True), so the detailed endpoint can
+        show each step without recomputing anything.
+        
+        Args:
+            equipment: Equipment parameters
+            
+        Returns:
+            (CalculationResult, trace) where trace holds the unrounded
+            intermediates: voltage_kv, K, cf, n, lg_ibf, term_1 ... term_6,
+            lg_ia, arcing_current, incident_energy, ppe_category,
+            arc_flash_boundary
+        """
+        voltage_kv = equipment.voltage / 1000.0
+        ibf = equipment.bolted_fault_current
+        gap = equipment.electrode_gap
+        t = equipment.fault_clearing_time
+        K, cf, n = self.PARAMS[equipment.enclosure_type]
         
-        # Step 2: Calculate incident energy
-        incident_energy = self.calculate_incident_energy(
-            equipment, arcing_current
+        # Step 1: Arcing current, term by term (see calculate_arcing_current)
+        lg_ibf = math.log10(ibf)
+        terms = (
+            K,
+            0.662 * lg_ibf,
+            0.0966 * voltage_kv,
+            0.000526 * gap,
+            0.5588 * voltage_kv * lg_ibf,
+            -0.00304 * gap * lg_ibf,
         )
+        lg_ia = sum(terms)
+        arcing_current = 10 ** lg_ia
         
-        # Step 3: Determine PPE category
+        # Steps 2-4: incident energy and boundary share the
+        # Cf * Ia^n * t product, so compute it once
+        d = equipment.working_distance
+        ia_n = arcing_current if n == 1.0 else arcing_current ** n
+        cf_ia_t = cf * ia_n * t
+        incident_energy = 4.184 * cf_ia_t * _INV_4PI / (d * d)
         ppe_category = self.determine_ppe_category(incident_energy)
+        boundary = math.sqrt(_BOUNDARY_K * cf_ia_t)
         
-        # Step 4: Calculate arc flash boundary
-        boundary = self.calculate_arc_flash_boundary(
-            equipment, arcing_current
+        trace: dict[str, Any] = {
+            "voltage_kv": voltage_kv,
+            "K": K,
+            "cf": cf,
+            "n": n,
+            "lg_ibf": lg_ibf,
+        }
+        for i, term in enumerate(terms, start=1):
+            trace[f"term_{i}"] = term
+        trace.update(
+            lg_ia=lg_ia,
+            arcing_current=arcing_current,
+            incident_energy=incident_energy,
+            ppe_category=ppe_category,
+            arc_flash_boundary=boundary
         )
         
-        # Step 5: Get correction factor
-        correction_factor = self.ENCLOSURE_FACTORS[equipment.enclosure_type]
+        result = self._build_result(
+            equipment,
+            arcing_current,
+            incident_energy,
+            ppe_category,
+            boundary,
+            cf
+        )
+        return result, trace
+    
+    def _build_result(
+        self,
+        equipment: EquipmentInput,
+        arcing_current: float,
+        incident_energy: float,
+        ppe_category: int,
+        boundary: float,
+        correction_factor: float
+    ) -> CalculationResult:
+        """Round calculated values and attach warnings"""
+        t = equipment.fault_clearing_time
+        warnings = []
         
-        # Warnings
-        if equipment.fault_clearing_time > 0.5:
+        if t > 0.5:
             warnings.append(
                 "Clearing time > 0.5s may indicate inadequate protection"
             )
@@ -83,18 +219,153 @@ class ArcFlashCalculator:
                 "Incident energy > 40 cal/cm² - consider additional protection"
             )
         
-        return CalculationResult(
+        # Fields are produced internally and already well-typed, so skip
+        # Pydantic validation when building the result
+        return CalculationResult.model_construct(
             equipment_name=equipment.name,
             incident_energy=round(incident_energy, 2),
             arc_flash_boundary=round(boundary, 1),
             ppe_category=ppe_category,
             arcing_current=round(arcing_current, 0),
-            arc_duration=equipment.fault_clearing_time,
+            arc_duration=t,
             correction_factor=correction_factor,
             warnings=warnings
         )
     
-    def calculate_arcing_current(self, equipment: EquipmentInput) -> float:
+    def calculate_batch(
+        self,
+        equipments: list[EquipmentInput]
+    ) -> list[CalculationResult]:
+        """
+        Perform arc flash calculations for many equipment items at once.
+        
+        Packs the inputs into arrays and runs calculate_batch_arrays, so
+        the per-item Python overhead is paid once per batch instead of
+        once per equipment.
+        
+        Args:
+            equipments: Equipment parameters
+            
+        Returns:
+            CalculationResult for each equipment, in input order
+        """
+        count = len(equipments)
+        if count == 0:
+            return []
+        
+        # Pack inputs into arrays (one per parameter)
+        arrays = self.calculate_batch_arrays(
+            voltage=np.fromiter(
+                (eq.voltage for eq in equipments), dtype=np.float64, count=count
+            ),
+            ibf=np.fromiter(
+                (eq.bolted_fault_current for eq in equipments), dtype=np.float64, count=count
+            ),
+            working_distance=np.fromiter(
+                (eq.working_distance for eq in equipments), dtype=np.float64, count=count
+            ),
+            gap=np.fromiter(
+                (eq.electrode_gap for eq in equipments), dtype=np.float64, count=count
+            ),
+            t=np.fromiter(
+                (eq.fault_clearing_time for eq in equipments), dtype=np.float64, count=count
+            ),
+            enclosure_codes=np.fromiter(
+                (self.ENCLOSURE_CODES[eq.enclosure_type] for eq in equipments),
+                dtype=np.intp,
+                count=count
+            )
+        )
+        
+        return [
+            self._build_result(eq, ia, energy, ppe, afb, factor)
+            for eq, ia, energy, ppe, afb, factor in zip(
+                equipments,
+                arrays["arcing_current"].tolist(),
+                arrays["incident_energy"].tolist(),
+                arrays["ppe_category"].tolist(),
+                arrays["arc_flash_boundary"].tolist(),
+                arrays["correction_factor"].tolist(),
+            )
+        ]
+    
+    def calculate_batch_arrays(
+        self,
+        voltage: np.ndarray,
+        ibf: np.ndarray,
+        working_distance: np.ndarray,
+        gap: np.ndarray,
+        t: np.ndarray,
+        enclosure_codes: np.ndarray
+    ) -> dict[str, np.ndarray]:
+        """
+        Vectorized arc flash calculation over parallel input arrays.
+        
+        Same equations as calculate(), with one NumPy operation per step
+        for the whole batch. All arrays must have the same length.
+        
+        Args:
+            voltage: System voltages (V)
+            ibf: Bolted fault currents (A)
+            working_distance: Working distances (inches)
+            gap: Conductor gaps (mm)
+            t: Fault clearing times (s)
+            enclosure_codes: Integer enclosure codes, see ENCLOSURE_CODES
+            
+        Returns:
+            Dict of unrounded arrays: arcing_current, incident_energy,
+            ppe_category, arc_flash_boundary, correction_factor
+        """
+        voltage_kv = np.asarray(voltage, dtype=np.float64) / 1000.0
+        ibf = np.asarray(ibf, dtype=np.float64)
+        d = np.asarray(working_distance, dtype=np.float64)
+        gap = np.asarray(gap, dtype=np.float64)
+        t = np.asarray(t, dtype=np.float64)
+        
+        # Gather per-row (K, Cf, n) constants
+        coeffs = _PARAMS_TABLE.take(enclosure_codes, axis=0)
+        K = coeffs[:, 0]
+        cf = coeffs[:, 1]
+        n = coeffs[:, 2]
+        
+        # Step 1: Arcing current (see calculate_arcing_current)
+        lg_ibf = np.log10(ibf)
+        lg_ia = (
+            K
+            + 0.662 * lg_ibf
+            + 0.0966 * voltage_kv
+            + 0.000526 * gap
+            + 0.5588 * voltage_kv * lg_ibf
+            - 0.00304 * gap * lg_ibf
+        )
+        arcing_current = np.power(10.0, lg_ia)
+        
+        # Step 2: Incident energy (see calculate_incident_energy)
+        ia_n = np.where(n == 1.0, arcing_current, np.power(arcing_current, n))
+        cf_ia_t = cf * ia_n * t
+        incident_energy = 4.184 * cf_ia_t * _INV_4PI / (d * d)
+        
+        # Step 3: PPE category, strict upper bounds as in determine_ppe_category
+        ppe_category = np.searchsorted(_PPE_THRESHOLDS, incident_energy, side="right")
+        
+        # Step 4: Arc flash boundary (see calculate_arc_flash_boundary)
+        boundary = np.sqrt(_BOUNDARY_K * cf_ia_t)
+        
+        return {
+            "arcing_current": arcing_current,
+            "incident_energy": incident_energy,
+            "ppe_category": ppe_category,
+            "arc_flash_boundary": boundary,
+            "correction_factor": cf,
+        }
+    
+    def calculate_arcing_current(
+        self,
+        voltage: float,
+        ibf: float,
+        gap: float,
+        K: float
+    ) -> float:
         """
         Calculate arcing current using IEEE 1584-2018 equations.
         
@@ -106,26 +377,29 @@ class ArcFlashCalculator:
         - Ibf = bolted fault current (A)
         - V = system voltage (kV)
         - G = conductor gap (mm)
-        - K = constant based on enclosure type
-        """
-        voltage_kv = equipment.voltage / 1000.0
-        ibf = equipment.bolted_fault_current
-        gap = equipment.electrode_gap
+        - K = constant based on enclosure type (see PARAMS)
         
-        # K constant varies by enclosure (simplified - full standard has more detail)
-        if equipment.enclosure_type in [EnclosureType.VCB, EnclosureType.VCBB, EnclosureType.HCB]:
-            K = -0.153  # Enclosed equipment
-        else:
-            K = -0.097  # Open air
+        Args:
+            voltage: System voltage (V)
+            ibf: Bolted fault current (A)
+            gap: Conductor gap (mm)
+            K: Enclosure constant
+        """
+        voltage_kv = voltage / 1000.0
         
+        # lg(Ibf) appears in three terms - evaluate it once
+        lg_ibf = math.log10(ibf)
+        vkv_lg_ibf = voltage_kv * lg_ibf
+        gap_lg_ibf = gap * lg_ibf
+
         # IEEE 1584-2018 arcing current equation
         lg_ia = (
-            K 
-            + 0.662 * math.log10(ibf)
+            K
+            + 0.662 * lg_ibf
             + 0.0966 * voltage_kv
             + 0.000526 * gap
-            + 0.5588 * voltage_kv * math.log10(ibf)
-            - 0.00304 * gap * math.log10(ibf)
+            + 0.5588 * vkv_lg_ibf
+            - 0.00304 * gap_lg_ibf
         )
         
         arcing_current = 10 ** lg_ia
@@ -133,9 +407,12 @@ class ArcFlashCalculator:
         return arcing_current
     
     def calculate_incident_energy(
-        self, 
-        equipment: EquipmentInput, 
-        arcing_current: float
+        self,
+        arcing_current: float,
+        t: float,
+        d: float,
+        cf: float,
+        n: float = 1.0
     ) -> float:
         """
         Calculate incident energy at working distance.
@@ -150,21 +427,16 @@ class ArcFlashCalculator:
         - t = arc duration (s)
         - D = working distance (inches)
         - n = exponent (typically 1.0 for enclosed, varies for open)
+        
+        Cf and n for an enclosure type come from PARAMS.
         """
-        cf = self.ENCLOSURE_FACTORS[equipment.enclosure_type]
         ia = arcing_current
-        t = equipment.fault_clearing_time
-        d = equipment.working_distance
-        
-        # Exponent n varies by configuration
-        if equipment.enclosure_type in [EnclosureType.VOA, EnclosureType.HOA]:
-            n = 1.0  # Open air
-        else:
-            n = 1.0  # Enclosed (simplified)
+        if n != 1.0:
+            ia = ia ** n
         
         # Incident energy calculation (simplified form)
         # Full IEEE equation is more complex with additional factors
-        energy = (4.184 * cf * (ia ** n) * t) / (4 * math.pi * (d ** 2))
+        energy = 4.184 * (cf * ia * t) * _INV_4PI / (d * d)
         
         return energy
     
@@ -179,21 +451,15 @@ class ArcFlashCalculator:
         - 3: 8 to 25 cal/cm²
         - 4: > 25 cal/cm²
         """
-        if incident_energy < 1.2:
-            return 0
-        elif incident_energy < 4:
-            return 1
-        elif incident_energy < 8:
-            return 2
-        elif incident_energy < 25:
-            return 3
-        else:
-            return 4
+        # bisect_right keeps the strict upper bounds: exactly 1.2 is Category 1
+        return bisect_right(_PPE_THRESHOLDS, incident_energy)
     
     def calculate_arc_flash_boundary(
         self,
-        equipment: EquipmentInput,
-        arcing_current: float
+        arcing_current: float,
+        t: float,
+        cf: float,
+        n: float = 1.0
     ) -> float:
         """
         Calculate arc flash boundary (distance where incident energy = 1.2 cal/cm²).
@@ -202,18 +468,55 @@ class ArcFlashCalculator:
         D = sqrt((4.184 * Cf * Ia^n * t) / (4π * E_threshold))
         
         Where E_threshold = 1.2 cal/cm² (onset of second-degree burn)
+        
+        Cf and n for an enclosure type come from PARAMS.
         """
-        cf = self.ENCLOSURE_FACTORS[equipment.enclosure_type]
         ia = arcing_current
-        t = equipment.fault_clearing_time
-        e_threshold = 1.2  # cal/cm²
-        n = 1.0
-        
-        # Solve for distance
-        numerator = 4.184 * cf * (ia ** n) * t
-        denominator = 4 * math.pi * e_threshold
+        if n != 1.0:
+            ia = ia ** n
         
-        boundary = math.sqrt(numerator / denominator)
+        # Solve for distance (E_threshold is folded into _BOUNDARY_K)
+        boundary = math.sqrt(_BOUNDARY_K * (cf * ia * t))
         
         return boundary
-        
\ No newline at end of file
+
+
+# ArcFlashCalculator.PARAMS as a (5, 3) float64 array of (K, Cf, n) rows,
+# indexed by ENCLOSURE_CODES. Rows feed the compiled kernel directly and
+# the batch path gathers them with one take()
+_PARAMS_TABLE = np.array(
+    [
+        ArcFlashCalculator.PARAMS[enclosure]
+        for enclosure in sorted(
+            ArcFlashCalculator.ENCLOSURE_CODES,
+            key=ArcFlashCalculator.ENCLOSURE_CODES.__getitem__
+        )
+    ]
+)
+
+
+@lru_cache(maxsize=4096)
+def _calculate_cached(
+    voltage: float,
+    ibf: float,
+    working_distance: float,
+    enclosure_type: EnclosureType,
+    gap: float,
+    t: float
+) -> tuple[float, float, int, float, float]:
+    """
+    Cached numeric core of ArcFlashCalculator.calculate.
+    
+    The calculation is a pure function of these inputs, so repeated
+    requests (UI sliders, parameter sweeps) are served from the cache.
+    
+    Returns:
+        (arcing current, incident energy, PPE category,
+         arc flash boundary, correction factor), unrounded
+    """
+    coeffs = _PARAMS_TABLE[ArcFlashCalculator.ENCLOSURE_CODES[enclosure_type]]
+    ia, energy, boundary = _ieee1584_core(
+        voltage / 1000.0, ibf, gap, t, working_distance, coeffs
+    )
+    cf = float(coeffs[1])
+    return ia, energy, bisect_right(_PPE_THRESHOLDS, energy), boundary, cf
@@ -0,0 +1,12 @@
+"""
+Shared pytest fixtures for the backend test suite.
+"""
+
+import pytest
+from app.services.arc_flash import ArcFlashCalculator
+
+
+@pytest.fixture(scope="session")
+def calculator():
+    """Shared calculator instance (stateless, safe to reuse across tests)"""
+    return ArcFlashCalculator()
@@ -0,0 +1,147 @@
+"""
+Test suite for the Arc Flash Studio API endpoints.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from app.main import MAX_BATCH_SIZE, app
+
+
+class TestStaticEndpoints:
+    """Test pre-serialized GET endpoints"""
+
+    @pytest.fixture
+    def client(self):
+        """Create API test client"""
+        return TestClient(app)
+
+    @pytest.mark.parametrize("path", ["/api/v1/health", "/api/v1/standards-info"])
+    def test_returns_json_with_etag(self, client, path):
+        """Test static payloads are JSON and carry an ETag"""
+        response = client.get(path)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.headers["etag"]
+        assert response.json()
+
+    @pytest.mark.parametrize("path", ["/api/v1/health", "/api/v1/standards-info"])
+    def test_matching_etag_not_modified(self, client, path):
+        """Test a matching If-None-Match gets 304 with no body"""
+        etag = client.get(path).headers["etag"]
+
+        response = client.get(path, headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+
+    @pytest.mark.parametrize("header", [
+        "*",
+        'W/{etag}',
+        '"0000000000000000", {etag}',
+        '"0000000000000000",W/{etag}',
+    ])
+    def test_etag_list_and_weak_forms_not_modified(self, client, header):
+        """Test wildcard, weak and listed tags in If-None-Match get 304"""
+        etag = client.get("/api/v1/health").headers["etag"]
+
+        response = client.get(
+            "/api/v1/health", headers={"If-None-Match": header.format(etag=etag)}
+        )
+
+        assert response.status_code == 304
+
+    def test_stale_etag_returns_payload(self, client):
+        """Test a non-matching If-None-Match gets the full payload"""
+        response = client.get(
+            "/api/v1/health", headers={"If-None-Match": 'W/"0000000000000000"'}
+        )
+
+        assert response.status_code == 200
+        assert response.json()
+
+    def test_health_payload(self, client):
+        """Test health check content"""
+        data = client.get("/api/v1/health").json()
+
+        assert data["status"] == "healthy"
+        assert data["standard"] == "IEEE 1584-2018"
+
+
+class TestCalculateEndpoints:
+    """Test calculation endpoints"""
+
+    @pytest.fixture
+    def client(self):
+        """Create API test client"""
+        return TestClient(app)
+
+    @pytest.fixture
+    def payload(self):
+        """Sample 480V equipment request body"""
+        return {
+            "name": "Main Switchboard",
+            "voltage": 480,
+            "bolted_fault_current": 40000,
+            "working_distance": 24,
+            "enclosure_type": "VCB",
+            "electrode_gap": 32,
+            "fault_clearing_time": 0.05,
+            "grounding": "solidly_grounded"
+        }
+
+    def test_calculate(self, client, payload):
+        """Test standard calculation endpoint"""
+        response = client.post("/api/v1/calculate", json=payload)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["equipment_name"] == "Main Switchboard"
+        assert data["incident_energy"] > 0
+
+    def test_calculate_detailed(self, client, payload):
+        """Test detailed endpoint returns the same result plus its steps"""
+        standard = client.post("/api/v1/calculate", json=payload).json()
+
+        response = client.post("/api/v1/calculate/detailed", json=payload)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["result"] == standard
+        steps = data["calculation_steps"]
+        assert steps["step_2_arcing_current"]["result"]["Ia"] == standard["arcing_current"]
+        assert steps["step_4_ppe_category"]["result"]["category"] == standard["ppe_category"]
+        assert data["ieee_references"]["sections_used"]
+
+    def test_calculate_batch(self, client, payload):
+        """Test batch endpoint matches single calculations, in order"""
+        equipments = [
+            payload,
+            {**payload, "name": "Slow Breaker", "fault_clearing_time": 0.5},
+            {**payload, "name": "Open Bus", "enclosure_type": "VOA"},
+        ]
+
+        response = client.post("/api/v1/calculate/batch", json=equipments)
+
+        assert response.status_code == 200
+        results = response.json()
+        assert results == [
+            client.post("/api/v1/calculate", json=equipment).json()
+            for equipment in equipments
+        ]
+
+    def test_calculate_batch_rejects_invalid_item(self, client, payload):
+        """Test one invalid equipment fails the whole batch validation"""
+        equipments = [payload, {**payload, "voltage": 120}]
+
+        response = client.post("/api/v1/calculate/batch", json=equipments)
+
+        assert response.status_code == 422
+
+    def test_calculate_batch_rejects_oversized_batch(self, client, payload):
+        """Test batches over MAX_BATCH_SIZE are rejected before calculating"""
+        equipments = [payload] * (MAX_BATCH_SIZE + 1)
+
+        response = client.post("/api/v1/calculate/batch", json=equipments)
+
+        assert response.status_code == 422
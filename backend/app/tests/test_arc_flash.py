@@ -3,74 +3,159 @@ Test suite for IEEE 1584-2018 arc flash calculations.
 Tests validate against known calculation examples.
 """
 
+import numpy as np
 import pytest
-from app.models.equipment import EquipmentInput, EnclosureType
-from app.services.arc_flash import ArcFlashCalculator
+from pydantic import ValidationError
+from app.models.equipment import EquipmentInput, EnclosureType, GroundingType
+from app.services import arc_flash
+from app.services.arc_flash import ArcFlashCalculator, _calculate_cached
+from app.services._arc_flash_kernels import _ieee1584_core
+
+
+# Known-valid 480V equipment fields; validation tests override one at a time
+_GOOD = {
+    "name": "Valid Equipment",
+    "voltage": 480,
+    "bolted_fault_current": 40000,
+    "working_distance": 24,
+    "enclosure_type": EnclosureType.VCB,
+    "electrode_gap": 32,
+    "fault_clearing_time": 0.05,
+}
+
+
+def _scenario(name, **overrides):
+    """Known-valid 480V equipment, built without validation"""
+    fields = {
+        **_GOOD,
+        "name": name,
+        "grounding": GroundingType.SOLIDLY_GROUNDED,
+        **overrides,
+    }
+    return EquipmentInput.model_construct(**fields)
+
+
+# Named scenarios, built once at import
+SCENARIOS = {
+    "sample": _scenario("Test Switchboard"),
+    "fast_clearing": _scenario("Fast Breaker", fault_clearing_time=0.02),
+    "slow_clearing": _scenario("Slow Breaker", fault_clearing_time=0.5),
+    "open_air": _scenario("Open Bus", enclosure_type=EnclosureType.VOA),
+    "high_energy": _scenario(
+        "High Energy Equipment",
+        bolted_fault_current=65000,  # Higher fault current
+        working_distance=18,  # Closer working distance
+        fault_clearing_time=0.3,  # Longer clearing time
+    ),
+}
+_SAMPLE = SCENARIOS["sample"]
+
+# Every scenario calculated together in one batch call, so test bodies only assert
+_RESULTS = dict(zip(SCENARIOS, ArcFlashCalculator().calculate_batch(list(SCENARIOS.values()))))
 
 
 class TestArcFlashCalculator:
     """Test IEEE 1584-2018 calculation engine"""
     
-    @pytest.fixture
-    def calculator(self):
-        """Create calculator instance for tests"""
-        return ArcFlashCalculator()
-    
-    @pytest.fixture
-    def sample_equipment(self):
-        """Sample 480V equipment for testing"""
-        return EquipmentInput(
-            name="Test Switchboard",
-            voltage=480,
-            bolted_fault_current=40000,
-            working_distance=24,
-            enclosure_type=EnclosureType.VCB,
-            electrode_gap=32,
-            fault_clearing_time=0.05,
-            grounding="solidly_grounded"
-        )
-    
     def test_calculator_initialization(self, calculator):
         """Test calculator can be instantiated"""
         assert calculator is not None
     
-    def test_arcing_current_calculation(self, calculator, sample_equipment):
+    def test_arcing_current_calculation(self, calculator):
         """Test arcing current calculation produces reasonable value"""
-        arcing_current = calculator.calculate_arcing_current(sample_equipment)
+        K, _, _ = calculator.PARAMS[_SAMPLE.enclosure_type]
+        arcing_current = calculator.calculate_arcing_current(
+            _SAMPLE.voltage,
+            _SAMPLE.bolted_fault_current,
+            _SAMPLE.electrode_gap,
+            K
+        )
         
         # Arcing current should be less than bolted fault current
-        assert arcing_current < sample_equipment.bolted_fault_current
+        assert arcing_current < _SAMPLE.bolted_fault_current
         # For 480V systems, typically 10-20% of bolted fault due to arc impedance
-        assert arcing_current > sample_equipment.bolted_fault_current * 0.1
-        assert arcing_current < sample_equipment.bolted_fault_current * 0.3
+        assert arcing_current > _SAMPLE.bolted_fault_current * 0.1
+        assert arcing_current < _SAMPLE.bolted_fault_current * 0.3
+    
+    def test_step_methods_match_calculate(self, calculator):
+        """Test the individual step methods agree with calculate()"""
+        K, cf, n = calculator.PARAMS[_SAMPLE.enclosure_type]
+        t = _SAMPLE.fault_clearing_time
+        
+        ia = calculator.calculate_arcing_current(
+            _SAMPLE.voltage,
+            _SAMPLE.bolted_fault_current,
+            _SAMPLE.electrode_gap,
+            K
+        )
+        energy = calculator.calculate_incident_energy(
+            ia, t, _SAMPLE.working_distance, cf, n
+        )
+        boundary = calculator.calculate_arc_flash_boundary(ia, t, cf, n)
+        
+        result = _RESULTS["sample"]
+        assert round(ia, 0) == result.arcing_current
+        assert round(energy, 2) == result.incident_energy
+        assert round(boundary, 1) == result.arc_flash_boundary
     
-    def test_incident_energy_calculation(self, calculator, sample_equipment):
+    def test_kernel_matches_step_methods(self, calculator):
+        """Test the compiled kernel applies K, Cf and n like the step methods"""
+        K, cf, n = -0.153, 0.973, 1.1  # n != 1 exercises the exponent path
+        ia, energy, boundary = _ieee1584_core(
+            0.48, 40000.0, 32.0, 0.2, 24.0, np.array([K, cf, n])
+        )
+        
+        assert ia == pytest.approx(
+            calculator.calculate_arcing_current(480, 40000, 32, K)
+        )
+        assert energy == pytest.approx(
+            calculator.calculate_incident_energy(ia, 0.2, 24, cf, n)
+        )
+        assert boundary == pytest.approx(
+            calculator.calculate_arc_flash_boundary(ia, 0.2, cf, n)
+        )
+    
+    def test_kernel_returns_python_floats(self):
+        """Test the kernel returns floats with and without Numba"""
+        # py_func is the uncompiled kernel, as run when numba is not installed
+        for kernel in (_ieee1584_core, getattr(_ieee1584_core, "py_func", _ieee1584_core)):
+            values = kernel(0.48, 40000.0, 32.0, 0.05, 24.0, np.array([-0.153, 1.0, 1.0]))
+            assert [type(value) for value in values] == [float, float, float]
+    
+    def test_incident_energy_calculation(self):
         """Test incident energy calculation"""
-        result = calculator.calculate(sample_equipment)
+        result = _RESULTS["sample"]
         
         # Incident energy should be positive
         assert result.incident_energy > 0
         # Should be reasonable for 480V, 40kA, 0.05s at 24"
         assert result.incident_energy < 50  # cal/cm²
     
-    def test_ppe_category_assignment(self, calculator, sample_equipment):
+    @pytest.mark.parametrize("name, expected", [
+        ("sample", 0),         # 0.16 cal/cm²
+        ("fast_clearing", 0),  # 0.06 cal/cm²
+        ("slow_clearing", 1),  # 1.60 cal/cm²
+        ("open_air", 0),       # 0.18 cal/cm²
+        ("high_energy", 1),    # 2.56 cal/cm²
+    ])
+    def test_ppe_category_assignment(self, name, expected):
         """Test PPE category follows NFPA 70E"""
-        result = calculator.calculate(sample_equipment)
-        
-        # PPE category must be 0-4
-        assert 0 <= result.ppe_category <= 4
-        
-        # Test known thresholds
-        if result.incident_energy <= 1.2:
-            assert result.ppe_category == 0
-        elif result.incident_energy <= 4:
-            assert result.ppe_category == 1
-        elif result.incident_energy <= 8:
-            assert result.ppe_category == 2
-    
-    def test_arc_flash_boundary_calculation(self, calculator, sample_equipment):
+        # Known categories, independent of the calculator's threshold table
+        assert _RESULTS[name].ppe_category == expected
+    
+    def test_ppe_category_thresholds(self, calculator):
+        """Test NFPA 70E category boundaries are exclusive upper bounds"""
+        assert calculator.determine_ppe_category(0.5) == 0
+        assert calculator.determine_ppe_category(1.2) == 1
+        assert calculator.determine_ppe_category(3.99) == 1
+        assert calculator.determine_ppe_category(4) == 2
+        assert calculator.determine_ppe_category(8) == 3
+        assert calculator.determine_ppe_category(25) == 4
+        assert calculator.determine_ppe_category(100) == 4
+
+    def test_arc_flash_boundary_calculation(self):
         """Test arc flash boundary is calculated correctly"""
-        result = calculator.calculate(sample_equipment)
+        result = _RESULTS["sample"]
         
         # Boundary should be positive
         assert result.arc_flash_boundary > 0
@@ -84,66 +169,156 @@ class TestArcFlashCalculator:
             assert result.arc_flash_boundary > 0
         else:
             # Higher energy - boundary should exceed working distance
-            assert result.arc_flash_boundary > sample_equipment.working_distance
+            assert result.arc_flash_boundary > _SAMPLE.working_distance
     
     def test_low_voltage_validation(self, calculator):
         """Test that voltage below 208V is rejected"""
-        with pytest.raises(ValueError):
-            EquipmentInput(
-                name="Too Low",
-                voltage=120,  # Below minimum
-                bolted_fault_current=5000,
-                working_distance=18,
-                enclosure_type=EnclosureType.VCB,
-                electrode_gap=25,
-                fault_clearing_time=0.1
-            )
+        with pytest.raises(ValidationError, match="voltage"):
+            EquipmentInput(**{**_GOOD, "voltage": 120})  # Below minimum
     
-    def test_different_enclosure_types(self, calculator, sample_equipment):
-        """Test that different enclosures give different results"""
-        # Calculate for VCB
-        sample_equipment.enclosure_type = EnclosureType.VCB
-        result_vcb = calculator.calculate(sample_equipment)
+    def test_calculation_trace_matches_result(self, calculator):
+        """Test the returned trace reproduces the standard result"""
+        result, trace = calculator.calculate(_SAMPLE, return_trace=True)
         
-        # Calculate for VOA (open air)
-        sample_equipment.enclosure_type = EnclosureType.VOA
-        result_voa = calculator.calculate(sample_equipment)
-        
-        # Open air should have different incident energy
-        assert result_vcb.incident_energy != result_voa.incident_energy
+        assert result == calculator.calculate(_SAMPLE)
+        assert trace["lg_ia"] == pytest.approx(
+            sum(trace[f"term_{i}"] for i in range(1, 7))
+        )
+        assert 10 ** trace["lg_ia"] == pytest.approx(trace["arcing_current"])
     
-    def test_clearing_time_impact(self, calculator, sample_equipment):
-        """Test that longer clearing time increases incident energy"""
-        sample_equipment.fault_clearing_time = 0.05
-        result_fast = calculator.calculate(sample_equipment)
-        
-        sample_equipment.fault_clearing_time = 0.5
-        result_slow = calculator.calculate(sample_equipment)
-        
-        # Longer time should mean more energy
-        assert result_slow.incident_energy > result_fast.incident_energy
-    
-    def test_high_energy_scenario(self, calculator):
-        """Test calculation with higher energy scenario"""
-        high_energy_equipment = EquipmentInput(
-            name="High Energy Equipment",
-            voltage=480,
-            bolted_fault_current=65000,  # Higher fault current
-            working_distance=18,  # Closer working distance
-            enclosure_type=EnclosureType.VCB,
-            electrode_gap=32,
-            fault_clearing_time=0.3,  # Longer clearing time
-            grounding="solidly_grounded"
+    def test_repeated_calculation_uses_cache(self, calculator):
+        """Test identical inputs are served from the result cache"""
+        first = calculator.calculate(_SAMPLE)
+        hits_before = _calculate_cached.cache_info().hits
+
+        renamed = _SAMPLE.model_copy(update={"name": "Same Ratings"})
+        second = calculator.calculate(renamed)
+
+        assert _calculate_cached.cache_info().hits == hits_before + 1
+        assert second.equipment_name == "Same Ratings"
+        assert second.incident_energy == first.incident_energy
+
+    def test_batch_matches_single_calculation(self, calculator):
+        """Test batch calculation gives the same results as calculate()"""
+        equipments = [
+            _SAMPLE.model_copy(update={"enclosure_type": enclosure})
+            for enclosure in EnclosureType
+        ]
+        equipments.append(
+            _SAMPLE.model_copy(update={"fault_clearing_time": 1.5})
         )
+
+        batch_results = calculator.calculate_batch(equipments)
+
+        assert len(batch_results) == len(equipments)
+        for equipment, batch_result in zip(equipments, batch_results):
+            assert batch_result == calculator.calculate(equipment)
+
+    def test_empty_batch(self, calculator):
+        """Test empty batch returns no results"""
+        assert calculator.calculate_batch([]) == []
+
+
+def _expect_shorter_clearing_less_energy(result):
+    """Shorter clearing time should mean less energy"""
+    assert result.incident_energy < _RESULTS["sample"].incident_energy
+
+
+def _expect_longer_clearing_more_energy(result):
+    """Longer clearing time should mean more energy"""
+    assert result.incident_energy > _RESULTS["sample"].incident_energy
+
+
+def _expect_open_air_differs(result):
+    """Open air should have different incident energy than VCB"""
+    assert result.incident_energy != _RESULTS["sample"].incident_energy
+
+
+def _expect_high_energy_hazard(result):
+    """Higher energy needs PPE and the boundary exceeds working distance"""
+    assert result.incident_energy > 1.0
+    assert result.arc_flash_boundary > SCENARIOS["high_energy"].working_distance
+    assert result.ppe_category >= 1
+
+
+SCENARIO_EXPECTATIONS = [
+    ("fast_clearing", _expect_shorter_clearing_less_energy),
+    ("slow_clearing", _expect_longer_clearing_more_energy),
+    ("open_air", _expect_open_air_differs),
+    ("high_energy", _expect_high_energy_hazard),
+]
+
+
+class TestScenarios:
+    """Test calculation behaviour across named equipment scenarios"""
+    
+    @pytest.mark.parametrize("name, expect", SCENARIO_EXPECTATIONS)
+    def test_scenario(self, name, expect):
+        """Test each scenario's expected behaviour"""
+        expect(_RESULTS[name])
+    
+    @pytest.mark.parametrize("name", list(SCENARIOS))
+    def test_scenario_matches_single_calculation(self, calculator, name):
+        """Test batched scenario results equal calculate() on each one"""
+        assert _RESULTS[name] == calculator.calculate(SCENARIOS[name])
+
+
+class TestArcFlashBatchArrays:
+    """Test the vectorized array API over all scenarios in one call"""
+    
+    @pytest.fixture(scope="module")
+    def batch(self, calculator):
+        """Run calculate_batch_arrays once for every scenario"""
+        equipments = list(SCENARIOS.values())
+        return calculator.calculate_batch_arrays(
+            voltage=np.array([eq.voltage for eq in equipments], dtype=np.float64),
+            ibf=np.array([eq.bolted_fault_current for eq in equipments], dtype=np.float64),
+            working_distance=np.array([eq.working_distance for eq in equipments], dtype=np.float64),
+            gap=np.array([eq.electrode_gap for eq in equipments], dtype=np.float64),
+            t=np.array([eq.fault_clearing_time for eq in equipments], dtype=np.float64),
+            enclosure_codes=np.array(
+                [calculator.ENCLOSURE_CODES[eq.enclosure_type] for eq in equipments]
+            )
+        )
+    
+    def test_one_row_per_scenario(self, batch):
+        """Test every output array has one entry per input row"""
+        for values in batch.values():
+            assert values.shape == (len(SCENARIOS),)
+    
+    def test_rows_match_batch_results(self, batch):
+        """Test array rows agree with the list-based batch results"""
+        for i, result in enumerate(_RESULTS.values()):
+            assert round(batch["incident_energy"][i], 2) == result.incident_energy
+            assert round(batch["arc_flash_boundary"][i], 1) == result.arc_flash_boundary
+            assert batch["ppe_category"][i] == result.ppe_category
+    
+    def test_exponent_matches_kernel(self, calculator, monkeypatch):
+        """Test the batch path applies n like the compiled kernel"""
+        row = np.array([-0.153, 0.973, 1.1])  # n != 1 exercises the exponent path
+        monkeypatch.setattr(arc_flash, "_PARAMS_TABLE", row[np.newaxis, :])
         
-        result = calculator.calculate(high_energy_equipment)
+        batch = calculator.calculate_batch_arrays(
+            voltage=np.array([480.0]),
+            ibf=np.array([40000.0]),
+            working_distance=np.array([24.0]),
+            gap=np.array([32.0]),
+            t=np.array([0.2]),
+            enclosure_codes=np.array([0])
+        )
+        ia, energy, boundary = _ieee1584_core(0.48, 40000.0, 32.0, 0.2, 24.0, row)
         
-        # Should produce higher incident energy
-        assert result.incident_energy > 1.0
-        # Boundary should exceed working distance for higher energy
-        assert result.arc_flash_boundary > high_energy_equipment.working_distance
-        # PPE category should be appropriate
-        assert result.ppe_category >= 1
+        assert batch["arcing_current"][0] == pytest.approx(ia)
+        assert batch["incident_energy"][0] == pytest.approx(energy)
+        assert batch["arc_flash_boundary"][0] == pytest.approx(boundary)
+    
+    def test_ppe_matches_scalar_thresholds(self, calculator, batch):
+        """Test vectorized PPE categories match determine_ppe_category"""
+        expected = [
+            calculator.determine_ppe_category(energy)
+            for energy in batch["incident_energy"].tolist()
+        ]
+        assert batch["ppe_category"].tolist() == expected
 
 
 # Test data validation
@@ -152,55 +327,27 @@ class TestEquipmentInputValidation:
     
     def test_valid_equipment_input(self):
         """Test valid input is accepted"""
-        equipment = EquipmentInput(
-            name="Valid Equipment",
-            voltage=480,
-            bolted_fault_current=40000,
-            working_distance=24,
-            enclosure_type=EnclosureType.VCB,
-            electrode_gap=32,
-            fault_clearing_time=0.05
-        )
+        equipment = EquipmentInput(**_GOOD)
         assert equipment.voltage == 480
     
+    def test_minimum_voltage_accepted(self):
+        """Test the 208V lower bound of IEEE 1584-2018 is inclusive"""
+        equipment = EquipmentInput(**{**_GOOD, "voltage": 208})
+        assert equipment.voltage == 208
+    
     def test_negative_voltage_rejected(self):
         """Test negative voltage is rejected"""
-        with pytest.raises(ValueError):
-            EquipmentInput(
-                name="Bad Voltage",
-                voltage=-480,
-                bolted_fault_current=40000,
-                working_distance=24,
-                enclosure_type=EnclosureType.VCB,
-                electrode_gap=32,
-                fault_clearing_time=0.05
-            )
+        with pytest.raises(ValidationError, match="voltage"):
+            EquipmentInput(**{**_GOOD, "voltage": -480})
     
     def test_zero_fault_current_rejected(self):
         """Test zero fault current is rejected"""
-        with pytest.raises(ValueError):
-            EquipmentInput(
-                name="No Fault",
-                voltage=480,
-                bolted_fault_current=0,
-                working_distance=24,
-                enclosure_type=EnclosureType.VCB,
-                electrode_gap=32,
-                fault_clearing_time=0.05
-            )
+        with pytest.raises(ValidationError, match="bolted_fault_current"):
+            EquipmentInput(**{**_GOOD, "bolted_fault_current": 0})
     
-    def test_excessive_clearing_time_accepted_with_warning(self):
+    def test_excessive_clearing_time_accepted_with_warning(self, calculator):
         """Test that long clearing times are accepted but generate warnings"""
-        equipment = EquipmentInput(
-            name="Slow Protection",
-            voltage=480,
-            bolted_fault_current=40000,
-            working_distance=24,
-            enclosure_type=EnclosureType.VCB,
-            electrode_gap=32,
-            fault_clearing_time=1.5  # Very long
-        )
-        calculator = ArcFlashCalculator()
+        equipment = EquipmentInput(**{**_GOOD, "fault_clearing_time": 1.5})  # Very long
         result = calculator.calculate(equipment)
         
         # Should calculate but include warning